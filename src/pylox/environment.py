@@ -3,28 +3,53 @@ from typing import Any
 from pylox.runtime_error import RuntimeError
 from pylox.tokens import Token
 
+# Distinguishes a missing name from a variable holding `nil`.
+SENTINEL = object()
+
+
+def undefined_variable(name: Token) -> RuntimeError:
+    return RuntimeError(name, f"Undefined variable `{name.lexeme}`.")
+
 
 class Environment:
-    def __init__(self, enclosing=None) -> None:
+    """A scope of variables.
+
+    The globals are a dict keyed by name, since they can be declared at any
+    point. Local scopes are lists indexed by the slots the Resolver assigned.
+    """
+
+    __slots__ = ("enclosing", "values")
+
+    def __init__(self, enclosing=None, values: list[Any] | None = None) -> None:
         self.enclosing: Environment | None = enclosing
-        self.values: dict[str, Any] = dict()
+        self.values: Any = dict() if values is None else values
 
     def define(self, name: str, value: Any) -> None:
         self.values[name] = value
 
     def get(self, name: Token) -> Any:
-        value = self.values.get(name.lexeme)
-        if (value is None) and (self.enclosing is not None):
-            value = self.enclosing.get(name)
-        if value is None:
-            raise RuntimeError(name, f"Undefined variable `{name.lexeme}`.")
+        value = self.values.get(name.lexeme, SENTINEL)
+        if value is SENTINEL:
+            raise undefined_variable(name)
         return value
 
     def assign(self, name: Token, value: Any) -> None:
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return None
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return None
-        raise RuntimeError(name, f"Undefined variable `{name.lexeme}`.")
+        lexeme = name.lexeme
+        if lexeme not in self.values:
+            raise undefined_variable(name)
+        self.values[lexeme] = value
+
+    def ancestor(self, depth: int) -> "Environment":
+        environment: Environment | None = self
+        for _ in range(depth):
+            assert environment is not None
+            environment = environment.enclosing
+        # The Resolver never counts more scopes than there are.
+        assert environment is not None
+        return environment
+
+    def get_at(self, depth: int, slot: int) -> Any:
+        return self.ancestor(depth).values[slot]
+
+    def assign_at(self, depth: int, slot: int, value: Any) -> None:
+        self.ancestor(depth).values[slot] = value
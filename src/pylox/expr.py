@@ -5,11 +5,12 @@ from typing import Any
 from pylox.scanner import Token
 
 
-class Expr(ABC):
+class Expr:
+
+	__slots__ = ()
 
-	@abstractmethod
 	def accept(self, visitor: ExprVisitor) -> Any:
-		pass
+		raise NotImplementedError
 
 
 class ExprVisitor(ABC):
@@ -49,35 +50,47 @@ class ExprVisitor(ABC):
 
 class Assign(Expr):
 
+	__slots__ = ("name", "value", "depth", "slot")
+
 	def __init__(self, name: Token, value: Expr):
 		self.name = name
 		self.value = value
+		self.depth: int | None = None
+		self.slot: int = 0
 
 	def accept(self, visitor: ExprVisitor)-> Any:
 		return visitor.visit_assign(self)
 
 class Binary(Expr):
 
+	__slots__ = ("left", "operator", "right", "operation")
+
 	def __init__(self, left: Expr, operator: Token, right: Expr):
 		self.left = left
 		self.operator = operator
 		self.right = right
+		self.operation: Any = None
 
 	def accept(self, visitor: ExprVisitor)-> Any:
 		return visitor.visit_binary(self)
 
 class Call(Expr):
 
+	__slots__ = ("callee", "paren", "arguments", "verified")
+
 	def __init__(self, callee: Expr, paren: Token, arguments: list[Expr]):
 		self.callee = callee
 		self.paren = paren
 		self.arguments = arguments
+		self.verified: bool = False
 
 	def accept(self, visitor: ExprVisitor)-> Any:
 		return visitor.visit_call(self)
 
 class Grouping(Expr):
 
+	__slots__ = ("expression",)
+
 	def __init__(self, expression: Expr):
 		self.expression = expression
 
@@ -86,6 +99,8 @@ class Grouping(Expr):
 
 class Literal(Expr):
 
+	__slots__ = ("value",)
+
 	def __init__(self, value: Any):
 		self.value = value
 
@@ -94,27 +109,37 @@ class Literal(Expr):
 
 class Logical(Expr):
 
+	__slots__ = ("left", "operator", "right", "is_or")
+
 	def __init__(self, left: Expr, operator: Token, right: Expr):
 		self.left = left
 		self.operator = operator
 		self.right = right
+		self.is_or: bool = False
 
 	def accept(self, visitor: ExprVisitor)-> Any:
 		return visitor.visit_logical(self)
 
 class Unary(Expr):
 
+	__slots__ = ("operator", "right", "operation")
+
 	def __init__(self, operator: Token, right: Expr):
 		self.operator = operator
 		self.right = right
+		self.operation: Any = None
 
 	def accept(self, visitor: ExprVisitor)-> Any:
 		return visitor.visit_unary(self)
 
 class Variable(Expr):
 
+	__slots__ = ("name", "depth", "slot")
+
 	def __init__(self, name: Token):
 		self.name = name
+		self.depth: int | None = None
+		self.slot: int = 0
 
 	def accept(self, visitor: ExprVisitor)-> Any:
 		return visitor.visit_variable(self)
\ No newline at end of file
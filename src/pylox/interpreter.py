@@ -4,11 +4,10 @@ from typing import Any
 from pylox import expr
 from pylox import stmt
 from pylox.runtime_error import RuntimeError
-from pylox.tokens import Token, TokenType
 from pylox.environment import Environment
 
 # from pylox.lox_callable import LoxCallable
-from typing import Protocol, runtime_checkable
+from typing import Protocol
 
 # from abc import ABC, abstractmethod
 
@@ -23,6 +22,8 @@ from typing import Protocol, runtime_checkable
 
 
 class Clock:
+    _lox_callable = True
+
     def arity(self) -> int:
         return 0
 
@@ -37,8 +38,14 @@ class Clock:
         return "<native fn>"
 
 
-@runtime_checkable
 class LoxCallable(Protocol):
+    """What a callable Lox value provides.
+
+    Implementations also set `_lox_callable = True`, which `visit_call`
+    checks with one getattr instead of an isinstance against the protocol.
+    """
+
+    _lox_callable: bool
 
     def call(
         self,
@@ -50,13 +57,18 @@ class LoxCallable(Protocol):
 
 
 class LoxFunction:
-    def __init__(self, declaration: stmt.FunctionStmt) -> None:
+    _lox_callable = True
+
+    def __init__(self, declaration: stmt.FunctionStmt, closure: Environment) -> None:
         self.declaration = declaration
+        self.closure = closure
+        # Parameters fill the first slots, the body's own locals follow.
+        self.locals = (None,) * (declaration.slot_count - len(declaration.params))
 
     def call(self, interpreter: Interpreter, arguments: list[Any]) -> None:
-        environment = Environment(interpreter.globals)
-        for i, parameter in enumerate(self.declaration.params):
-            environment.define(parameter.lexeme, arguments[i])
+        # `arguments` is built fresh for each call, so it becomes the frame.
+        arguments.extend(self.locals)
+        environment = Environment(self.closure, arguments)
         interpreter.execute_block(self.declaration.body, environment)
         return None
 
@@ -69,9 +81,12 @@ class LoxFunction:
 
 class Interpreter(expr.ExprVisitor, stmt.StmtVisitor):
     globals = Environment()
+    # Upper bound on block environments kept around for reuse.
+    POOL_SIZE = 64
 
     def __init__(self) -> None:
         self.environment = self.globals
+        self.environment_pool: list[Environment] = list()
         self.globals.define("clock", Clock())
 
     def interpret(self, statements: list[stmt.Stmt]) -> None:
@@ -80,25 +95,25 @@ class Interpreter(expr.ExprVisitor, stmt.StmtVisitor):
 
     def execute(self, statement: stmt.Stmt):
         """Call the relevent visit method."""
-        statement.accept(self)
+        _STMT_DISPATCH[type(statement)](self, statement)
 
     def evaluate(self, expression: expr.Expr) -> Any:
         """Call the relevent visit method."""
-        return expression.accept(self)
+        return _EXPR_DISPATCH[type(expression)](self, expression)
 
     def visit_call(self, call: expr.Call):
         """Interpret a function or method call."""
         function: Any = self.evaluate(call.callee)
+        if call.verified:  # the resolver has checked the callee and arity
+            return function.call(self, [self.evaluate(a) for a in call.arguments])
         # check if callee is callable
-        if not isinstance(function, LoxCallable):
+        if not getattr(function, "_lox_callable", False):
             raise RuntimeError(
                 call.paren,
                 "Can only call functions and classes.",
             )
         # prepare arguments
-        arguments = list()
-        for argument in call.arguments:
-            arguments.append(self.evaluate(argument))
+        arguments = [self.evaluate(argument) for argument in call.arguments]
         # arity check
         if len(arguments) != function.arity():
             raise RuntimeError(
@@ -108,7 +123,30 @@ class Interpreter(expr.ExprVisitor, stmt.StmtVisitor):
         return function.call(self, arguments)
 
     def visit_block_stmt(self, block_stmt: stmt.BlockStmt):
-        self.execute_block(block_stmt.statements, Environment(self.environment))
+        if block_stmt.slot_count == 0:  # no locals, so no scope of its own
+            for statement in block_stmt.statements:
+                self.execute(statement)
+            return None
+        if block_stmt.captured:  # a closure may keep hold of this scope
+            environment = Environment(
+                self.environment,
+                [None] * block_stmt.slot_count,
+            )
+            self.execute_block(block_stmt.statements, environment)
+            return None
+        pool = self.environment_pool
+        if pool:
+            environment = pool.pop()
+            environment.enclosing = self.environment
+            environment.values = [None] * block_stmt.slot_count
+        else:
+            environment = Environment(
+                self.environment,
+                [None] * block_stmt.slot_count,
+            )
+        self.execute_block(block_stmt.statements, environment)
+        if len(pool) < self.POOL_SIZE:
+            pool.append(environment)
         return None
 
     def execute_block(self, statements: list[stmt.Stmt], environment: Environment):
@@ -124,21 +162,46 @@ class Interpreter(expr.ExprVisitor, stmt.StmtVisitor):
         value: Any = None
         if var_stmt.initialiser != None:
             value = self.evaluate(var_stmt.initialiser)
-        self.environment.define(var_stmt.name.lexeme, value)
+        if var_stmt.slot is None:
+            self.globals.define(var_stmt.name.lexeme, value)
+        else:
+            self.environment.values[var_stmt.slot] = value
         return None
 
     def visit_while_stmt(self, while_stmt: stmt.WhileStmt) -> Any:
-        while self.is_truthy(self.evaluate(while_stmt.condition)):
-            self.execute(while_stmt.body)
+        # Lox truthiness: only `false` and `nil` are falsey.
+        condition: expr.Expr = while_stmt.condition
+        body: stmt.Stmt = while_stmt.body
+        while (value := self.evaluate(condition)) is not None and value is not False:
+            self.execute(body)
         return None
 
     def visit_assign(self, assign: expr.Assign) -> Any:
         value: Any = self.evaluate(assign.value)
-        self.environment.assign(assign.name, value)
+        depth = assign.depth
+        if depth is None:
+            self.globals.assign(assign.name, value)
+        elif depth == 0:  # the commonest depths skip the walk up the chain
+            self.environment.values[assign.slot] = value
+        elif depth == 1:
+            enclosing = self.environment.enclosing
+            assert enclosing is not None  # the Resolver counted a scope here
+            enclosing.values[assign.slot] = value
+        else:
+            self.environment.assign_at(depth, assign.slot, value)
         return value
 
     def visit_variable(self, variable: expr.Variable) -> Any:
-        return self.environment.get(variable.name)
+        depth = variable.depth
+        if depth is None:
+            return self.globals.get(variable.name)
+        if depth == 0:  # the commonest depths skip the walk up the chain
+            return self.environment.values[variable.slot]
+        if depth == 1:
+            enclosing = self.environment.enclosing
+            assert enclosing is not None  # the Resolver counted a scope here
+            return enclosing.values[variable.slot]
+        return self.environment.get_at(depth, variable.slot)
 
     def visit_expression_stmt(self, expression_stmt: stmt.ExpressionStmt) -> Any:
         self.evaluate(expression_stmt.expression)
@@ -146,13 +209,16 @@ class Interpreter(expr.ExprVisitor, stmt.StmtVisitor):
 
     def visit_function_stmt(self, function_stmt: stmt.FunctionStmt) -> Any:
         """Assign a function to the environment."""
-        function = LoxFunction(function_stmt)
-        self.environment.define(function_stmt.name.lexeme, function)
+        function = LoxFunction(function_stmt, self.environment)
+        if function_stmt.slot is None:
+            self.globals.define(function_stmt.name.lexeme, function)
+        else:
+            self.environment.values[function_stmt.slot] = function
         return None
 
     def visit_if_stmt(self, if_stmt: stmt.IfStmt) -> Any:
         condition_outcome: Any = self.evaluate(if_stmt.condition)
-        if self.is_truthy(condition_outcome):
+        if condition_outcome is not None and condition_outcome is not False:
             self.execute(if_stmt.then_branch)
         elif if_stmt.else_branch is not None:
             self.execute(if_stmt.else_branch)
@@ -169,102 +235,64 @@ class Interpreter(expr.ExprVisitor, stmt.StmtVisitor):
     def visit_logical(self, logical: expr.Logical) -> Any:
         """Interpret a logical expression containing `and` or `or`."""
         left: Any = self.evaluate(logical.left)
-        match logical.operator.token_type:
-            case TokenType.OR:
-                if self.is_truthy(left):  # left is True, so we return it
-                    return left
-                right: Any = self.evaluate(logical.right)
-                if self.is_truthy(right):  # right is true, so we return it
-                    return right
-                return left  # return left if we can
-            case TokenType.AND:
-                if not self.is_truthy(left):  # left is False, so we return it
-                    return left
-                right: Any = self.evaluate(logical.right)
-                if not self.is_truthy(right):  # right is False, so we return it
-                    return right
-                return left  # return left if we can
+        if logical.is_or:
+            # left is True, so we return it
+            if left is not None and left is not False:
+                return left
+            right: Any = self.evaluate(logical.right)
+            # right is true, so we return it
+            if right is not None and right is not False:
+                return right
+            return left  # return left if we can
+        if left is None or left is False:  # left is False, so we return it
+            return left
+        right = self.evaluate(logical.right)
+        if right is None or right is False:  # right is False, so we return it
+            return right
+        return left  # return left if we can
 
     def visit_grouping(self, grouping: expr.Grouping) -> Any:
         return self.evaluate(grouping.expression)
 
     def visit_unary(self, unary: expr.Unary) -> Any:
-        right = self.evaluate(unary.right)
-        match unary.operator.token_type:
-            case TokenType.MINUS:
-                self.check_number_operand(unary.operator, right)
-                return -float(right)
-            case TokenType.BANG:
-                return not self.is_truthy(right)
-        raise NotImplementedError(
-            "need to implement error handling for the interpreter"
-        )
-
-    def is_truthy(self, value: Any) -> bool:
-        """False and `nil` are Falsey, everything else is Truthy"""
-        match value:
-            case None:
-                return False
-            case bool():
-                return value
-            case _:
-                return True
+        """Apply the operation bound to the node by the Resolver."""
+        right: Any = self.evaluate(unary.right)
+        return unary.operation(right, unary.operator)
 
     def visit_binary(self, binary: expr.Binary) -> Any:
+        """Apply the operation bound to the node by the Resolver."""
         left: Any = self.evaluate(binary.left)
         right: Any = self.evaluate(binary.right)
-        match binary.operator.token_type:
-            case TokenType.GREATER:
-                self.check_number_operands(binary.operator, left, right)
-                return float(left) > float(right)
-            case TokenType.GREATER_EQUAL:
-                self.check_number_operands(binary.operator, left, right)
-                return float(left) >= float(right)
-            case TokenType.LESS:
-                self.check_number_operands(binary.operator, left, right)
-                return float(left) < float(right)
-            case TokenType.LESS_EQUAL:
-                self.check_number_operands(binary.operator, left, right)
-                return float(left) <= float(right)
-            case TokenType.MINUS:
-                self.check_number_operands(binary.operator, left, right)
-                return float(left) - float(right)
-            case TokenType.SLASH:
-                self.check_number_operands(binary.operator, left, right)
-                return float(left) / float(right)
-            case TokenType.STAR:
-                self.check_number_operands(binary.operator, left, right)
-                return float(left) * float(right)
-            case TokenType.PLUS:
-                # acting as if this is a statically typed language
-                if isinstance(left, float) and isinstance(right, float):
-                    return float(left) + float(right)
-                if isinstance(left, str) and isinstance(right, str):
-                    return str(left) + str(right)
-                raise RuntimeError(
-                    binary.operator,
-                    "Operands must be two numbers or two strings",
-                )
-            case TokenType.BANG_EQUAL:
-                return not left == right
-            case TokenType.EQUAL_EQUAL:
-                return left == right
-        raise NotImplementedError()
-
-    def check_number_operand(self, operator: Token, operand: Any):
-        if isinstance(operand, float):
-            return None
-        raise RuntimeError(operator, "Operand must be a number.")
-
-    def check_number_operands(self, operator: Token, left: Any, right: Any):
-        if isinstance(left, float) and isinstance(right, float):
-            return None
-        raise RuntimeError(operator, "Operands must be numbers.")
+        return binary.operation(left, right, binary.operator)
 
     # def interpret(self, expression: expr.Expr) -> None:
     #     value = self.evaluate(expression)
     #     print(str(value))
 
 
+# Dispatch on the node type directly, skipping the `accept` call. The node
+# classes are never subclassed, so `type()` is an exact key.
+_EXPR_DISPATCH: dict[type, Any] = {
+    expr.Assign: Interpreter.visit_assign,
+    expr.Binary: Interpreter.visit_binary,
+    expr.Call: Interpreter.visit_call,
+    expr.Grouping: Interpreter.visit_grouping,
+    expr.Literal: Interpreter.visit_literal,
+    expr.Logical: Interpreter.visit_logical,
+    expr.Unary: Interpreter.visit_unary,
+    expr.Variable: Interpreter.visit_variable,
+}
+
+_STMT_DISPATCH: dict[type, Any] = {
+    stmt.BlockStmt: Interpreter.visit_block_stmt,
+    stmt.ExpressionStmt: Interpreter.visit_expression_stmt,
+    stmt.FunctionStmt: Interpreter.visit_function_stmt,
+    stmt.IfStmt: Interpreter.visit_if_stmt,
+    stmt.PrintStmt: Interpreter.visit_print_stmt,
+    stmt.VarStmt: Interpreter.visit_var_stmt,
+    stmt.WhileStmt: Interpreter.visit_while_stmt,
+}
+
+
 if __name__ == "__main__":
     interpreter = Interpreter()
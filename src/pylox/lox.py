@@ -3,6 +3,7 @@ from pylox.interpreter import Interpreter
 from pylox.scanner import Scanner, ScannerError
 from pylox.tokens import Token, TokenType
 from pylox.parser import Parser, ParserError
+from pylox.resolver import Resolver
 from pylox.runtime_error import RuntimeError
 
 
@@ -33,25 +34,28 @@ class Lox:
         tokens: list[Token] = scanner.tokens
         # print(tokens)
         parser = Parser(tokens)
-        try:
-            statements: list[stmt.Stmt] = parser.parse()
-        except ParserError as e:
-            if e.token.token_type == TokenType.EOF:
-                self.report(e.token.line, " at end ", e.message)
-            else:
-                self.report(e.token.line, f" at '{e.token.lexeme}' ", e.message)
+        statements: list[stmt.Stmt] = parser.parse()
+        if parser.errors:
+            for error in parser.errors:
+                self.parser_error(error)
             return None
+        Resolver().resolve(statements)
         # printer = AstPrinter()
         # for statement in statements:
         #     print(printer.print(statement))
-        interpreter = Interpreter()
         try:
-            interpreter.interpret(statements)
+            Interpreter().interpret(statements)
         except RuntimeError as e:
             print(f"{e.message}\n[line {e.token.line}]")
             self.had_runtime_error = True
         return None
 
+    def parser_error(self, e: ParserError):
+        if e.token.token_type == TokenType.EOF:
+            self.report(e.token.line, " at end ", e.message)
+        else:
+            self.report(e.token.line, f" at '{e.token.lexeme}' ", e.message)
+
     def error(self, line: int, message: str):
         self.report(line, "", message)
 
@@ -1,81 +1,181 @@
 """parser.py"""
 
+from typing import Callable
+
 from pylox.tokens import TokenType, Token
 
 from pylox import stmt
 from pylox import expr
 
+# The nodes built per expression are imported by name, which saves an
+# attribute lookup on the module every time one is constructed.
+from pylox.expr import (
+    Assign,
+    Binary,
+    Call,
+    Grouping,
+    Literal,
+    Logical,
+    Unary,
+    Variable,
+)
+
+
+# Literal nodes are never mutated, so equal values can share one node.
+# Keyed on the type too, as 1.0 == True in Python but not in Lox.
+_LITERAL_CACHE: dict[tuple[type, object], Literal] = dict()
+
+
+def make_literal(value: object) -> Literal:
+    """Return a shared Literal node for small constant values."""
+    if isinstance(value, str) and len(value) > 32:
+        return Literal(value)
+    key = (type(value), value)
+    literal = _LITERAL_CACHE.get(key)
+    if literal is None:
+        literal = _LITERAL_CACHE[key] = Literal(value)
+    return literal
+
+
+# How tightly each binary operator binds, from `or` up to factor.
+BINARY_PRECEDENCE: dict[TokenType, int] = {
+    TokenType.OR: 1,
+    TokenType.AND: 2,
+    TokenType.BANG_EQUAL: 3,
+    TokenType.EQUAL_EQUAL: 3,
+    TokenType.GREATER: 4,
+    TokenType.GREATER_EQUAL: 4,
+    TokenType.LESS: 4,
+    TokenType.LESS_EQUAL: 4,
+    TokenType.MINUS: 5,
+    TokenType.PLUS: 5,
+    TokenType.SLASH: 6,
+    TokenType.STAR: 6,
+}
+
+# The node each binary operator builds. `and` and `or` short-circuit, so
+# they get a Logical node rather than a Binary.
+BINARY_NODES: dict[TokenType, type[Binary] | type[Logical]] = {
+    token_type: Binary for token_type in BINARY_PRECEDENCE
+}
+BINARY_NODES[TokenType.OR] = BINARY_NODES[TokenType.AND] = Logical
+
+UNARY_OPERATORS: frozenset[TokenType] = frozenset(
+    (TokenType.BANG, TokenType.MINUS)
+)
+
+# Most statements start with one of these, so parsing resumes there after an
+# error.
+STATEMENT_STARTS: frozenset[TokenType] = frozenset(
+    (
+        TokenType.CLASS,
+        TokenType.FUN,
+        TokenType.VAR,
+        TokenType.FOR,
+        TokenType.IF,
+        TokenType.WHILE,
+        TokenType.PRINT,
+        TokenType.RETURN,
+    )
+)
+
+# The nodes for the keywords that are literals, whose values the Scanner
+# leaves unset.
+KEYWORD_LITERALS: dict[TokenType, Literal] = {
+    TokenType.FALSE: make_literal(False),
+    TokenType.TRUE: make_literal(True),
+    TokenType.NIL: make_literal(None),
+}
+
 
 class ParserError(Exception):
-    def __init__(self, token: Token, message: str):
+    # Without slots, setting the attributes would give each error a __dict__.
+    __slots__ = ("token", "message")
+
+    def __init__(self, token: Token, message: str) -> None:
+        super().__init__(message)
         self.token = token
         self.message = message
 
 
 class Parser:
     def __init__(self, tokens: list[Token]) -> None:
-        self.tokens = tokens
-        self.current = 0
+        self.tokens: list[Token] = tokens
+        self.current: int = 0
+        # Syntax errors recovered from, in the order they were met.
+        self.errors: list[ParserError] = list()
+        # Index of the EOF token the Scanner always ends with.
+        self.last: int = len(tokens) - 1
 
     def parse(self) -> list[stmt.Stmt]:
         """Parse the tokens into a list of statements."""
-        statements = list()
-        while not self.is_at_end():
-            statement: stmt.Stmt | None = self.declaration()
-            statements.append(statement)
+        statements: list[stmt.Stmt] = list()
+        append = statements.append
+        declaration = self.declaration
+        last: int = self.last
+        while self.current < last:
+            try:
+                append(declaration())
+            except ParserError as error:
+                self.recover(error)
         return statements
 
-    def is_at_end(self):
+    def is_at_end(self) -> bool:
         """Check if current token is EOF (End Of File)."""
-        current_token = self.tokens[self.current]
-        return current_token.token_type == TokenType.EOF
+        return self.current >= self.last
 
-    def declaration(self):
+    def declaration(self) -> stmt.Stmt:
         """Checks for Variable declaration, otherwise runs as a statement."""
-        try:
-            if self.match(TokenType.FUN):
-                return self.function("function")
-            if self.match(TokenType.VAR):
-                return self.var_declaration()
-            return self.statement()
-        except ParserError:
-            self.synchronise()
-            return None
+        token_type: TokenType = self.tokens[self.current].token_type
+        if token_type is TokenType.FUN:
+            self.current += 1
+            return self.function("function")
+        if token_type is TokenType.VAR:
+            self.current += 1
+            return self.var_declaration()
+        return self.statement()
+
+    def recover(self, error: ParserError) -> None:
+        """Panic mode: note the error and skip to the next statement.
+
+        The statement in error is left out, so one pass reports every syntax
+        error rather than only the first.
+        """
+        self.errors.append(error)
+        self.synchronise()
 
     def statement(self) -> stmt.Stmt:
-        """Return the next statement from the tokens."""
-        if self.match(TokenType.FOR):
-            return self.for_statement()
-        if self.match(TokenType.IF):
-            return self.if_statement()
-        if self.match(TokenType.PRINT):
-            return self.print_statement()
-        if self.match(TokenType.WHILE):
-            return self.while_statement()
-        if self.match(TokenType.LEFT_BRACE):
-            return stmt.BlockStmt(self.block())
-        return self.expression_statement()
-
-    def match(self, *token_types: TokenType) -> bool:
-        """If the token types match, advance."""
-        for token_type in token_types:
-            if self.check(token_type):
-                self.advance()
-                return True
+        """Dispatch on the current token to the rule in STATEMENT_RULES.
+
+        Anything without a keyword of its own is an expression statement.
+        """
+        rule = STATEMENT_RULES.get(self.tokens[self.current].token_type)
+        if rule is None:
+            return self.expression_statement()
+        self.current += 1
+        return rule(self)
+
+    def match(self, token_type: TokenType) -> bool:
+        """If the current token is of the given type, advance past it.
+
+        Never asked to match EOF, so there is no need to guard the end.
+        """
+        if self.tokens[self.current].token_type is token_type:
+            self.current += 1
+            return True
         return False
 
     def check(self, token_type: TokenType) -> bool:
         """Checks whether the current token matches the token_type."""
-        current_token: Token = self.tokens[self.current]
-        return current_token.token_type == token_type
+        return self.tokens[self.current].token_type is token_type
 
-    def peek(self):
+    def peek(self) -> Token:
         return self.tokens[self.current]
 
     def advance(self) -> Token:
-        if not self.is_at_end():
+        if self.current < self.last:
             self.current += 1
-        return self.previous()
+        return self.tokens[self.current - 1]
 
     def previous(self) -> Token:
         """Return the most recently consumed token."""
@@ -85,94 +185,84 @@ class Parser:
         return self.assignment()
 
     def assignment(self) -> expr.Expr:
-        expression = self._or()
-        if self.match(TokenType.EQUAL):
-            equals: Token = self.previous()
-            value: expr.Expr = self.assignment()
-            if isinstance(expression, expr.Variable):
-                name: Token = expression.name
-                return expr.Assign(name, value)
-            raise ParserError(equals, "Invalid assignment target")
-            # Book says do not throw error.
-            # Book uses function `error`
-        return expression
-
-    def _or(self) -> expr.Expr:
-        """Handle Or Expression or pass through."""
-        expression: expr.Expr = self._and()
-        while self.match(TokenType.OR):
-            operator: Token = self.previous()
-            right: expr.Expr = self._and()
-            expression = expr.Logical(expression, operator, right)
-        return expression
-
-    def _and(self) -> expr.Expr:
-        "Handle And Expression or pass through."
-        expression: expr.Expr = self.equality()
-        while self.match(TokenType.AND):
-            operator: Token = self.previous()
-            right: expr.Expr = self.equality()
-            expression = expr.Logical(expression, operator, right)
-        return expression
-
-    def equality(self) -> expr.Expr:
-        expression: expr.Expr = self.comparison()
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator: Token = self.previous()
-            right: expr.Expr = self.comparison()
-            expression = expr.Binary(expression, operator, right)
-        return expression
-
-    def comparison(self) -> expr.Expr:
-        expression: expr.Expr = self.term()
-        while self.match(
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-        ):
-            operator: Token = self.previous()
-            right: expr.Expr = self.term()
-            expression = expr.Binary(expression, operator, right)
+        """Parse a chain of assignments, `a = b = c`, without recursing.
+
+        Assignment is right associative, so the targets are collected left
+        to right and wrapped around the value from the innermost out.
+        """
+        expression = self.binary()
+        tokens: list[Token] = self.tokens
+        if tokens[self.current].token_type is not TokenType.EQUAL:
+            return expression
+        targets: list[tuple[expr.Expr, Token]] = list()
+        while (equals := tokens[self.current]).token_type is TokenType.EQUAL:
+            self.current += 1
+            targets.append((expression, equals))
+            expression = self.binary()
+        for target, equals in reversed(targets):
+            if not isinstance(target, Variable):
+                raise ParserError(equals, "Invalid assignment target")
+                # Book says do not throw error.
+                # Book uses function `error`
+            expression = Assign(target.name, expression)
         return expression
 
-    def term(self) -> expr.Expr:
-        expression: expr.Expr = self.factor()
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator: Token = self.previous()
-            right: expr.Expr = self.factor()
-            expression = expr.Binary(expression, operator, right)
-        return expression
+    def binary(self, min_precedence: int = 1) -> expr.Expr:
+        """Parse binary operators binding at least as tightly as min_precedence.
 
-    def factor(self) -> expr.Expr:
+        Precedence climbing: one loop over BINARY_PRECEDENCE stands in for a
+        method per level (or, and, equality, comparison, term, factor), so an
+        operand costs one call here rather than six. Operators of equal
+        precedence are consumed by the loop, which keeps them left associative.
+        """
         expression: expr.Expr = self.unary()
-        while self.match(TokenType.SLASH, TokenType.STAR):
-            operator: Token = self.previous()
-            right: expr.Expr = self.unary()
-            expression = expr.Binary(expression, operator, right)
-        return expression
+        tokens: list[Token] = self.tokens
+        while True:
+            operator: Token = tokens[self.current]
+            precedence = BINARY_PRECEDENCE.get(operator.token_type, 0)
+            if precedence < min_precedence:
+                return expression
+            self.current += 1
+            right: expr.Expr = self.binary(precedence + 1)
+            node = BINARY_NODES[operator.token_type]
+            expression = node(expression, operator, right)
 
     def unary(self) -> expr.Expr:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator: Token = self.previous()
-            right: expr.Expr = self.unary()
-            return expr.Unary(operator, right)
-        return self.call()
+        """Parse any prefix operators, then wrap them around the operand.
+
+        The operators are skipped over in a loop and read back from the
+        token list, innermost first, rather than recursing once for each.
+        """
+        tokens: list[Token] = self.tokens
+        start = self.current
+        if tokens[start].token_type not in UNARY_OPERATORS:
+            return self.call()
+        end = start + 1
+        while tokens[end].token_type in UNARY_OPERATORS:
+            end += 1
+        self.current = end
+        expression: expr.Expr = self.call()
+        for index in range(end - 1, start - 1, -1):
+            expression = Unary(tokens[index], expression)
+        return expression
 
     def call(self) -> expr.Expr:
         """Handles call syntax, moves on to primary if no match."""
         expression = self.primary()
-        while True:
-            if self.match(TokenType.LEFT_PAREN):
-                expression = self.finish_call(expression)
-            break
+        if self.tokens[self.current].token_type is TokenType.LEFT_PAREN:
+            self.current += 1
+            expression = self.finish_call(expression)
         return expression
 
     def finish_call(self, callee: expr.Expr) -> expr.Expr:
-        arguments: list[expr.Expr] = list()
-        if not self.check(TokenType.RIGHT_PAREN):
-            arguments.append(self.expression())
-        while self.match(TokenType.COMMA):
+        tokens: list[Token] = self.tokens
+        paren: Token = tokens[self.current]
+        if paren.token_type is TokenType.RIGHT_PAREN:  # the common `f()`
+            self.current += 1
+            return Call(callee, paren, list())
+        arguments: list[expr.Expr] = [self.expression()]
+        while tokens[self.current].token_type is TokenType.COMMA:
+            self.current += 1
             if len(arguments) >= 255:
                 # book says report error, but do not raise. Need to
                 raise ParserError(
@@ -180,53 +270,52 @@ class Parser:
                     "Cannot have more than 255 arguments.",
                 )
             arguments.append(self.expression())
-        paren: Token = self.consume(
+        paren = self.consume(
             TokenType.RIGHT_PAREN,
             "Expect `)` after arguments.",
         )
-        return expr.Call(callee, paren, arguments)
+        return Call(callee, paren, arguments)
 
     def primary(self) -> expr.Expr:
-        if self.match(TokenType.FALSE):
-            return expr.Literal(False)
-        if self.match(TokenType.TRUE):
-            return expr.Literal(True)
-        if self.match(TokenType.NIL):
-            return expr.Literal(None)
-        if self.match(TokenType.NUMBER, TokenType.STRING):
-            return expr.Literal(self.previous().literal)
-        if self.match(TokenType.IDENTIFIER):
-            return expr.Variable(self.previous())
-        if self.match(TokenType.LEFT_PAREN):
-            expression = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return expr.Grouping(expression)
-        raise ParserError(self.peek(), "Expext Expression")
-
-    def consume(self, token_type: TokenType, message: str):
-        if self.check(token_type):
-            return self.advance()
-        raise ParserError(self.peek(), message)
-
-    def synchronise(self):
+        """Dispatch on the current token to the rule in PRIMARY_RULES."""
+        token: Token = self.tokens[self.current]
+        rule = PRIMARY_RULES.get(token.token_type)
+        if rule is None:
+            raise ParserError(token, "Expext Expression")
+        self.current += 1
+        return rule(self, token)
+
+    def literal(self, token: Token) -> expr.Expr:
+        return make_literal(token.literal)
+
+    def keyword_literal(self, token: Token) -> expr.Expr:
+        return KEYWORD_LITERALS[token.token_type]
+
+    def variable(self, token: Token) -> expr.Expr:
+        return Variable(token)
+
+    def grouping(self, token: Token) -> expr.Expr:
+        expression = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Grouping(expression)
+
+    def consume(self, token_type: TokenType, message: str) -> Token:
+        # Never asked for EOF, so a match is always before the end.
+        token: Token = self.tokens[self.current]
+        if token.token_type is token_type:
+            self.current += 1
+            return token
+        raise ParserError(token, message)
+
+    def synchronise(self) -> None:
         self.advance()
-        # most statements start with one of these
-        statement_starts = [
-            TokenType.CLASS,
-            TokenType.FUN,
-            TokenType.VAR,
-            TokenType.FOR,
-            TokenType.IF,
-            TokenType.WHILE,
-            TokenType.PRINT,
-            TokenType.RETURN,
-        ]
-        while not self.is_at_end():
-            if self.previous().token_type == TokenType.SEMICOLON:
+        tokens: list[Token] = self.tokens
+        while self.current < self.last:
+            if tokens[self.current - 1].token_type is TokenType.SEMICOLON:
                 return None
-            if self.peek().token_type in statement_starts:
+            if tokens[self.current].token_type in STATEMENT_STARTS:
                 return None
-            self.advance()
+            self.current += 1
 
     def var_declaration(self) -> stmt.Stmt:
         name: Token = self.consume(
@@ -247,11 +336,6 @@ class Parser:
         self.consume(TokenType.LEFT_PAREN, f"Expect `(` after {kind} name.")
         parameters: list[Token] = list()
         if not self.check(TokenType.RIGHT_PAREN):
-            if len(parameters) >= 255:
-                raise ParserError(
-                    self.peek(),
-                    "Cannot have more than 255 parameters",
-                )
             parameters.append(
                 self.consume(
                     TokenType.IDENTIFIER,
@@ -259,14 +343,19 @@ class Parser:
                 )
             )
             while self.match(TokenType.COMMA):
+                if len(parameters) >= 255:
+                    raise ParserError(
+                        self.peek(),
+                        "Cannot have more than 255 parameters",
+                    )
                 parameters.append(
                     self.consume(
                         TokenType.IDENTIFIER,
                         "Expect parameter name",
                     )
                 )
-            self.consume(TokenType.RIGHT_PAREN, "Expect `)` after parameters")
-        self.consume(TokenType.LEFT_BRACE, "Expect `{`"+ f"before {kind} body")
+        self.consume(TokenType.RIGHT_PAREN, "Expect `)` after parameters")
+        self.consume(TokenType.LEFT_BRACE, f"Expect `{{` before {kind} body")
         body: list[stmt.Stmt] = self.block()
         return stmt.FunctionStmt(name, parameters, body)
 
@@ -302,14 +391,14 @@ class Parser:
             )
         # Add the condition to the loop
         if condition is None:
-            condition = expr.Literal(True)
+            condition = make_literal(True)
         body = stmt.WhileStmt(condition, body)
         # Add the initialiser if needed
         if initialiser is not None:
             body = stmt.BlockStmt([initialiser, body])
         return body
 
-    def if_statement(self):
+    def if_statement(self) -> stmt.Stmt:
         """Parse an if statement."""
         self.consume(TokenType.LEFT_PAREN, "Expect `(` after `if`.")
         condition: expr.Expr = self.expression()
@@ -328,10 +417,21 @@ class Parser:
         body: stmt.Stmt = self.statement()
         return stmt.WhileStmt(condition, body)
 
+    def block_statement(self) -> stmt.Stmt:
+        return stmt.BlockStmt(self.block())
+
     def block(self) -> list[stmt.Stmt]:
-        statements = list()
-        while (not self.check(TokenType.RIGHT_BRACE)) and (not self.is_at_end()):
-            statements.append(self.declaration())
+        statements: list[stmt.Stmt] = list()
+        tokens: list[Token] = self.tokens
+        last: int = self.last
+        while (
+            tokens[self.current].token_type is not TokenType.RIGHT_BRACE
+            and self.current < last
+        ):
+            try:
+                statements.append(self.declaration())
+            except ParserError as error:
+                self.recover(error)
         self.consume(TokenType.RIGHT_BRACE, "Expect `}` after block.")
         return statements
 
@@ -344,3 +444,26 @@ class Parser:
         expression: expr.Expr = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect `;` after value")
         return stmt.ExpressionStmt(expression)
+
+
+# The rule for each token that can start a primary expression, called with
+# that token once it has been consumed.
+PRIMARY_RULES: dict[TokenType, Callable[[Parser, Token], expr.Expr]] = {
+    TokenType.FALSE: Parser.keyword_literal,
+    TokenType.TRUE: Parser.keyword_literal,
+    TokenType.NIL: Parser.keyword_literal,
+    TokenType.NUMBER: Parser.literal,
+    TokenType.STRING: Parser.literal,
+    TokenType.IDENTIFIER: Parser.variable,
+    TokenType.LEFT_PAREN: Parser.grouping,
+}
+
+# The rule for each keyword that starts a statement, called once the keyword
+# has been consumed.
+STATEMENT_RULES: dict[TokenType, Callable[[Parser], stmt.Stmt]] = {
+    TokenType.FOR: Parser.for_statement,
+    TokenType.IF: Parser.if_statement,
+    TokenType.PRINT: Parser.print_statement,
+    TokenType.WHILE: Parser.while_statement,
+    TokenType.LEFT_BRACE: Parser.block_statement,
+}
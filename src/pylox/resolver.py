@@ -0,0 +1,425 @@
+"""resolver.py"""
+
+from typing import Any, Callable
+
+from pylox import expr, stmt
+from pylox.runtime_error import RuntimeError
+from pylox.tokens import Token, TokenType
+
+
+def greater(left: Any, right: Any, operator: Token) -> bool:
+    if isinstance(left, float) and isinstance(right, float):
+        return left > right
+    raise RuntimeError(operator, "Operands must be numbers.")
+
+
+def greater_equal(left: Any, right: Any, operator: Token) -> bool:
+    if isinstance(left, float) and isinstance(right, float):
+        return left >= right
+    raise RuntimeError(operator, "Operands must be numbers.")
+
+
+def less(left: Any, right: Any, operator: Token) -> bool:
+    if isinstance(left, float) and isinstance(right, float):
+        return left < right
+    raise RuntimeError(operator, "Operands must be numbers.")
+
+
+def less_equal(left: Any, right: Any, operator: Token) -> bool:
+    if isinstance(left, float) and isinstance(right, float):
+        return left <= right
+    raise RuntimeError(operator, "Operands must be numbers.")
+
+
+def subtract(left: Any, right: Any, operator: Token) -> float:
+    if isinstance(left, float) and isinstance(right, float):
+        return left - right
+    raise RuntimeError(operator, "Operands must be numbers.")
+
+
+def divide(left: Any, right: Any, operator: Token) -> float:
+    if isinstance(left, float) and isinstance(right, float):
+        return left / right
+    raise RuntimeError(operator, "Operands must be numbers.")
+
+
+def multiply(left: Any, right: Any, operator: Token) -> float:
+    if isinstance(left, float) and isinstance(right, float):
+        return left * right
+    raise RuntimeError(operator, "Operands must be numbers.")
+
+
+def add(left: Any, right: Any, operator: Token) -> Any:
+    # acting as if this is a statically typed language
+    if isinstance(left, float) and isinstance(right, float):
+        return left + right
+    if isinstance(left, str) and isinstance(right, str):
+        return left + right
+    raise RuntimeError(operator, "Operands must be two numbers or two strings")
+
+
+def equal(left: Any, right: Any, operator: Token) -> bool:
+    return left == right
+
+
+def not_equal(left: Any, right: Any, operator: Token) -> bool:
+    return not left == right
+
+
+# Bound instead of the checked handlers when the Resolver can tell both
+# operands are numbers.
+
+
+def add_numbers(left: float, right: float, operator: Token) -> float:
+    return left + right
+
+
+def subtract_numbers(left: float, right: float, operator: Token) -> float:
+    return left - right
+
+
+def multiply_numbers(left: float, right: float, operator: Token) -> float:
+    return left * right
+
+
+def divide_numbers(left: float, right: float, operator: Token) -> float:
+    return left / right
+
+
+def greater_numbers(left: float, right: float, operator: Token) -> bool:
+    return left > right
+
+
+def greater_equal_numbers(left: float, right: float, operator: Token) -> bool:
+    return left >= right
+
+
+def less_numbers(left: float, right: float, operator: Token) -> bool:
+    return left < right
+
+
+def less_equal_numbers(left: float, right: float, operator: Token) -> bool:
+    return left <= right
+
+
+def negate(right: Any, operator: Token) -> float:
+    if isinstance(right, float):
+        return -right
+    raise RuntimeError(operator, "Operand must be a number.")
+
+
+def not_(right: Any, operator: Token) -> bool:
+    return right is None or right is False
+
+
+BINARY_OPERATIONS: dict[TokenType, Callable[[Any, Any, Token], Any]] = {
+    TokenType.GREATER: greater,
+    TokenType.GREATER_EQUAL: greater_equal,
+    TokenType.LESS: less,
+    TokenType.LESS_EQUAL: less_equal,
+    TokenType.MINUS: subtract,
+    TokenType.SLASH: divide,
+    TokenType.STAR: multiply,
+    TokenType.PLUS: add,
+    TokenType.BANG_EQUAL: not_equal,
+    TokenType.EQUAL_EQUAL: equal,
+}
+
+NUMBER_OPERATIONS: dict[Callable, Callable[[float, float, Token], Any]] = {
+    add: add_numbers,
+    subtract: subtract_numbers,
+    multiply: multiply_numbers,
+    divide: divide_numbers,
+    greater: greater_numbers,
+    greater_equal: greater_equal_numbers,
+    less: less_numbers,
+    less_equal: less_equal_numbers,
+}
+
+# Operations whose result, if they return at all, is always a number.
+NUMBER_RESULTS: frozenset[Callable] = frozenset(
+    (
+        subtract,
+        multiply,
+        divide,
+        negate,
+        add_numbers,
+        subtract_numbers,
+        multiply_numbers,
+        divide_numbers,
+    )
+)
+
+
+def is_number(expression: expr.Expr) -> bool:
+    """Whether an already resolved expression can only evaluate to a number."""
+    if isinstance(expression, expr.Literal):
+        return isinstance(expression.value, float)
+    if isinstance(expression, (expr.Binary, expr.Unary)):
+        return expression.operation in NUMBER_RESULTS
+    return False
+
+
+UNARY_OPERATIONS: dict[TokenType, Callable[[Any, Token], Any]] = {
+    TokenType.MINUS: negate,
+    TokenType.BANG: not_,
+}
+
+
+def declares_function(statements: list[stmt.Stmt]) -> bool:
+    """Whether a function is declared anywhere among the statements."""
+    for statement in statements:
+        if isinstance(statement, stmt.FunctionStmt):
+            return True
+        if isinstance(statement, stmt.BlockStmt):
+            nested = statement.statements
+        elif isinstance(statement, stmt.IfStmt):
+            nested = [statement.then_branch]
+            if statement.else_branch is not None:
+                nested.append(statement.else_branch)
+        elif isinstance(statement, stmt.WhileStmt):
+            nested = [statement.body]
+        else:
+            continue
+        if declares_function(nested):
+            return True
+    return False
+
+
+class Scope:
+    """The locals declared in one block or function body.
+
+    A scope is either a frame, with an Environment of its own at runtime, or
+    is hoisted into the frame of an enclosing scope and numbers its slots
+    after that frame's.
+    """
+
+    def __init__(self, frame: "Scope | None" = None) -> None:
+        self.frame: Scope = self if frame is None else frame
+        # How many slots the frame needs, counting those of hoisted scopes.
+        self.size = 0
+        self.slots: dict[str, int] = dict()
+        # The declaration in each slot, while only a `fun` has ever bound it.
+        self.functions: dict[int, stmt.FunctionStmt | None] = dict()
+        self.calls: list[tuple[int, expr.Call]] = list()
+        # Whether a function declared inside could outlive the scope.
+        self.captured = False
+
+
+class Resolver(expr.ExprVisitor, stmt.StmtVisitor):
+    """Walk the AST once before it is interpreted, specialising nodes.
+
+    Local variables are given a slot in their scope, and every use of one is
+    annotated with how many scopes out it lives. Anything not found in a
+    local scope is left to be looked up in the globals by name. Blocks nested
+    in a function or another block, that declare no function, are hoisted
+    into the enclosing frame so running them allocates no Environment.
+
+    Expression visits return the node to use in place of the one visited,
+    which lets expressions made only of literals be folded into a Literal.
+
+    Calls to a local function that is never reassigned or redeclared are
+    checked against its declaration here, so the interpreter can skip its
+    own callable and arity checks for them.
+    """
+
+    def __init__(self) -> None:
+        self.scopes: list[Scope] = list()
+
+    def resolve(self, statements: list[stmt.Stmt]) -> None:
+        for statement in statements:
+            statement.accept(self)
+
+    def resolve_expression(self, expression: expr.Expr) -> expr.Expr:
+        return expression.accept(self)
+
+    def begin_scope(self, hoisted: bool = False) -> None:
+        frame = self.scopes[-1].frame if hoisted else None
+        self.scopes.append(Scope(frame))
+
+    def end_scope(self) -> int:
+        """Close the innermost scope, returning how many slots it needs."""
+        scope = self.scopes.pop()
+        # Only now is it known which slots are never rebound.
+        for slot, call in scope.calls:
+            function = scope.functions[slot]
+            if function is not None and len(function.params) == len(call.arguments):
+                call.verified = True
+        return scope.size
+
+    def declare(
+        self,
+        name: Token,
+        function: stmt.FunctionStmt | None = None,
+    ) -> int | None:
+        """Give a name a slot in the innermost scope, None for globals."""
+        if not self.scopes:
+            return None
+        scope = self.scopes[-1]
+        slot = scope.slots.get(name.lexeme)
+        if slot is None:
+            frame = scope.frame
+            slot = scope.slots[name.lexeme] = frame.size
+            frame.size += 1
+            scope.functions[slot] = function
+        else:
+            scope.functions[slot] = None
+        return slot
+
+    def resolve_local(self, node: expr.Variable | expr.Assign) -> Scope | None:
+        """Annotate a local with its depth and slot, returning its scope."""
+        depth = 0
+        for scope in reversed(self.scopes):
+            slot = scope.slots.get(node.name.lexeme)
+            if slot is not None:
+                node.depth = depth
+                node.slot = slot
+                return scope
+            if scope.frame is scope:  # only frames are a step up at runtime
+                depth += 1
+        return None
+
+    def visit_block_stmt(self, block_stmt: stmt.BlockStmt) -> None:
+        # A block declaring nothing gets no scope, and so no runtime Environment.
+        if not any(
+            isinstance(statement, (stmt.VarStmt, stmt.FunctionStmt))
+            for statement in block_stmt.statements
+        ):
+            self.resolve(block_stmt.statements)
+            return None
+        # Without a closure to outlive it, a nested block needs no Environment:
+        # its locals take further slots in the enclosing frame.
+        if self.scopes and not declares_function(block_stmt.statements):
+            self.begin_scope(hoisted=True)
+            self.resolve(block_stmt.statements)
+            self.end_scope()
+            return None
+        self.begin_scope()
+        self.resolve(block_stmt.statements)
+        block_stmt.captured = self.scopes[-1].captured
+        block_stmt.slot_count = self.end_scope()
+
+    def visit_expression_stmt(self, expression_stmt: stmt.ExpressionStmt) -> None:
+        expression_stmt.expression = self.resolve_expression(
+            expression_stmt.expression
+        )
+
+    def visit_function_stmt(self, function_stmt: stmt.FunctionStmt) -> None:
+        # Declared before the body is resolved so the function can recurse.
+        function_stmt.slot = self.declare(function_stmt.name, function_stmt)
+        for scope in self.scopes:
+            scope.captured = True
+        self.begin_scope()
+        for param in function_stmt.params:
+            self.declare(param)
+        self.resolve(function_stmt.body)
+        function_stmt.slot_count = self.end_scope()
+
+    def visit_if_stmt(self, if_stmt: stmt.IfStmt) -> None:
+        if_stmt.condition = self.resolve_expression(if_stmt.condition)
+        if_stmt.then_branch.accept(self)
+        if if_stmt.else_branch is not None:
+            if_stmt.else_branch.accept(self)
+
+    def visit_print_stmt(self, print_stmt: stmt.PrintStmt) -> None:
+        print_stmt.expression = self.resolve_expression(print_stmt.expression)
+
+    def visit_var_stmt(self, var_stmt: stmt.VarStmt) -> None:
+        # The initialiser may still refer to an outer variable of the same name.
+        if var_stmt.initialiser is not None:
+            var_stmt.initialiser = self.resolve_expression(var_stmt.initialiser)
+        var_stmt.slot = self.declare(var_stmt.name)
+
+    def visit_while_stmt(self, while_stmt: stmt.WhileStmt) -> None:
+        while_stmt.condition = self.resolve_expression(while_stmt.condition)
+        while_stmt.body.accept(self)
+
+    def visit_assign(self, assign: expr.Assign) -> expr.Expr:
+        assign.value = self.resolve_expression(assign.value)
+        scope = self.resolve_local(assign)
+        if scope is not None:
+            scope.functions[assign.slot] = None
+        return assign
+
+    def visit_binary(self, binary: expr.Binary) -> expr.Expr:
+        """Bind the Python callable for the operator, once per node."""
+        binary.left = self.resolve_expression(binary.left)
+        binary.right = self.resolve_expression(binary.right)
+        binary.operation = BINARY_OPERATIONS[binary.operator.token_type]
+        left, right = binary.left, binary.right
+        if isinstance(left, expr.Literal) and isinstance(right, expr.Literal):
+            return self.fold_binary(binary, left, right)
+        if (
+            binary.operation in NUMBER_OPERATIONS
+            and is_number(binary.left)
+            and is_number(binary.right)
+        ):
+            binary.operation = NUMBER_OPERATIONS[binary.operation]
+        return binary
+
+    def fold_binary(
+        self, binary: expr.Binary, left: expr.Literal, right: expr.Literal
+    ) -> expr.Expr:
+        """Evaluate a binary of two literals now, unless it would fail."""
+        try:
+            return expr.Literal(
+                binary.operation(left.value, right.value, binary.operator)
+            )
+        except (RuntimeError, ZeroDivisionError):
+            return binary  # leave the error to be raised at runtime
+
+    def visit_call(self, call: expr.Call) -> expr.Expr:
+        call.callee = self.resolve_expression(call.callee)
+        call.arguments = [self.resolve_expression(a) for a in call.arguments]
+        callee = call.callee
+        if isinstance(callee, expr.Variable):
+            scope = self.resolve_local(callee)
+            if scope is not None:
+                scope.calls.append((callee.slot, call))
+        return call
+
+    def visit_grouping(self, grouping: expr.Grouping) -> expr.Expr:
+        # Grouping only matters to the parser, evaluation can skip it.
+        return self.resolve_expression(grouping.expression)
+
+    def visit_literal(self, literal: expr.Literal) -> expr.Expr:
+        return literal
+
+    def visit_logical(self, logical: expr.Logical) -> expr.Expr:
+        logical.left = self.resolve_expression(logical.left)
+        logical.right = self.resolve_expression(logical.right)
+        logical.is_or = logical.operator.token_type == TokenType.OR
+        left = logical.left
+        if isinstance(left, expr.Literal):
+            return self.fold_logical(logical, left)
+        return logical
+
+    def fold_logical(self, logical: expr.Logical, left: expr.Literal) -> expr.Expr:
+        """Fold a logical with a literal left operand, where the result is known.
+
+        `or` gives the left operand when it is truthy, and `and` when it is
+        falsey. Otherwise the result is the right operand when its truthiness
+        matches the operator's, `or` truthy and `and` falsey, else the left.
+        """
+        left_truthy = left.value is not None and left.value is not False
+        if left_truthy is logical.is_or:
+            return left
+        right = logical.right
+        if not isinstance(right, expr.Literal):
+            return logical
+        right_truthy = right.value is not None and right.value is not False
+        return right if right_truthy is logical.is_or else left
+
+    def visit_unary(self, unary: expr.Unary) -> expr.Expr:
+        unary.right = self.resolve_expression(unary.right)
+        unary.operation = UNARY_OPERATIONS[unary.operator.token_type]
+        if not isinstance(unary.right, expr.Literal):
+            return unary
+        try:
+            return expr.Literal(unary.operation(unary.right.value, unary.operator))
+        except RuntimeError:
+            return unary  # leave the error to be raised at runtime
+
+    def visit_variable(self, variable: expr.Variable) -> expr.Expr:
+        self.resolve_local(variable)
+        return variable
@@ -1,3 +1,6 @@
+import re
+import sys
+
 from pylox.tokens import Token, TokenType
 
 
@@ -20,6 +23,62 @@ KEYWORDS = {
     "while": TokenType.WHILE,
 }
 
+# Looked up before the match in scan_token, so the commonest punctuation
+# costs one dict probe rather than a run of comparisons.
+SINGLE_CHARACTER_TOKENS: dict[str, TokenType] = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+}
+
+# The token for each character alone, and for it followed by `=`.
+EQUAL_SUFFIXED_TOKENS: dict[str, tuple[TokenType, TokenType]] = {
+    "!": (TokenType.BANG, TokenType.BANG_EQUAL),
+    "=": (TokenType.EQUAL, TokenType.EQUAL_EQUAL),
+    "<": (TokenType.LESS, TokenType.LESS_EQUAL),
+    ">": (TokenType.GREATER, TokenType.GREATER_EQUAL),
+}
+
+# The rest of a number or identifier once its first character is known, so
+# the scan runs in the regex engine rather than a character at a time. A `.`
+# after the digits is taken even with no digits following, so `1.` is 1.0.
+NUMBER_REST = re.compile(r"\d*(?:\.\d*)?")
+# Matches what str.isidentifier() or str.isalnum() accepts for one character:
+# \w, plus the four identifier characters that are not alphanumeric.
+IDENTIFIER_REST = re.compile(r"[\w\u1885\u1886\u2118\u212e]*")
+
+# Every punctuation token by its lexeme, for the pattern below.
+PUNCTUATION_TOKENS: dict[str, TokenType] = {
+    **SINGLE_CHARACTER_TOKENS,
+    "/": TokenType.SLASH,
+    **{char: alone for char, (alone, _) in EQUAL_SUFFIXED_TOKENS.items()},
+    **{char + "=": paired for char, (_, paired) in EQUAL_SUFFIXED_TOKENS.items()},
+}
+
+# What scan_tokens tries first at each position: any spaces, then one group
+# per kind of token, so a whole token is found by one match in the regex
+# engine. Newlines get a group of their own, to count lines. Whatever none of
+# them match, such as an identifier starting with a non-ASCII letter or an
+# unterminated string, is left to scan_token.
+NEWLINE, IDENTIFIER, COMMENT, PUNCTUATION, NUMBER, STRING = range(1, 7)
+TOKEN_PATTERN = re.compile(
+    r"[^\S\n]*(?:"
+    r"(\n)"
+    r"|([A-Za-z_]" + IDENTIFIER_REST.pattern + r")"
+    r"|(//[^\n]*)"
+    r"|([!=<>]=?|[(){},.\-+;*/])"
+    r"|([0-9]" + NUMBER_REST.pattern + r")"
+    r'|("[^"]*")'
+    r")"
+)
+
 
 class ScannerError(Exception):
     def __init__(self, line, message):
@@ -35,9 +94,41 @@ class Scanner:
         self.line = 1
 
     def scan_tokens(self):
-        while not self.is_at_end():
-            self.start = self.current
-            self.scan_token()
+        source: str = self.source
+        end: int = len(source)
+        match = TOKEN_PATTERN.match
+        append = self.tokens.append
+        intern = sys.intern
+        line: int = self.line
+        position: int = self.current
+        while position < end:
+            found = match(source, position)
+            if found is None:  # leave anything unusual to scan_token
+                self.start = self.current = position
+                self.line = line
+                self.scan_token()
+                position = self.current
+                line = self.line
+                continue
+            kind: int = found.lastindex
+            text: str = found.group(kind)
+            position = found.end()
+            if kind == NEWLINE:
+                line += 1
+            elif kind == IDENTIFIER:
+                token_type = KEYWORDS.get(text, TokenType.IDENTIFIER)
+                append(Token(token_type, intern(text), None, line))
+            elif kind == PUNCTUATION:
+                append(Token(PUNCTUATION_TOKENS[text], intern(text), None, line))
+            elif kind == NUMBER:
+                append(Token(TokenType.NUMBER, intern(text), float(text), line))
+            elif kind == STRING:
+                # Strings may span lines, the token takes the line they end on.
+                line += text.count("\n")
+                append(Token(TokenType.STRING, intern(text), text[1:-1], line))
+            # A COMMENT needs nothing, it is skipped like the spaces before it.
+        self.start = self.current = position
+        self.line = line
         end_token = Token(TokenType.EOF, "", None, self.line)
         self.tokens.append(end_token)
 
@@ -46,57 +137,27 @@ class Scanner:
 
     def scan_token(self) -> None:
         char: str = self.advance()
+        # single character tokens
+        token_type: TokenType | None = SINGLE_CHARACTER_TOKENS.get(char)
+        if token_type is not None:
+            self.add_token(token_type)
+            return None
+        # one or two character tokens
+        pair: tuple[TokenType, TokenType] | None = EQUAL_SUFFIXED_TOKENS.get(char)
+        if pair is not None:
+            if self.peek() == "=":
+                self.current += 1
+                self.add_token(pair[1])
+            else:
+                self.add_token(pair[0])
+            return None
         match char:
-            # single character tokens
-            case "(":
-                self.add_token(TokenType.LEFT_PAREN)
-            case ")":
-                self.add_token(TokenType.RIGHT_PAREN)
-            case "{":
-                self.add_token(TokenType.LEFT_BRACE)
-            case "}":
-                self.add_token(TokenType.RIGHT_BRACE)
-            case ",":
-                self.add_token(TokenType.COMMA)
-            case ".":
-                self.add_token(TokenType.DOT)
-            case "-":
-                self.add_token(TokenType.MINUS)
-            case "+":
-                self.add_token(TokenType.PLUS)
-            case ";":
-                self.add_token(TokenType.SEMICOLON)
-            case "*":
-                self.add_token(TokenType.STAR)
-            case "!":
-                token_type = TokenType.BANG
-                if self.peek() == "=":
-                    self.current += 1
-                    token_type = TokenType.BANG_EQUAL
-                self.add_token(token_type)
-            case "=":
-                token_type = TokenType.EQUAL
-                if self.peek() == "=":
-                    self.current += 1
-                    token_type = TokenType.EQUAL_EQUAL
-                self.add_token(token_type)
-            case "<":
-                token_type = TokenType.LESS
-                if self.peek() == "=":
-                    self.current += 1
-                    token_type = TokenType.LESS_EQUAL
-                self.add_token(token_type)
-            case ">":
-                token_type = TokenType.GREATER
-                if self.peek() == "=":
-                    self.current += 1
-                    token_type = TokenType.GREATER_EQUAL
-                self.add_token(token_type)
             # Comments
             case "/":
                 if self.peek() == "/":
-                    while (self.peek() != "\n") and (not self.is_at_end()):
-                        self.advance()
+                    # Stop short of the newline, so the line still gets counted.
+                    newline: int = self.source.find("\n", self.current)
+                    self.current = len(self.source) if newline == -1 else newline
                 else:
                     self.add_token(TokenType.SLASH)
             # Increment on newline
@@ -126,7 +187,8 @@ class Scanner:
         return char
 
     def add_token(self, token_type: TokenType, literal=None):
-        lexeme: str = self.source[self.start : self.current]
+        # Interned so environment lookups compare names by identity.
+        lexeme: str = sys.intern(self.source[self.start : self.current])
         token = Token(token_type, lexeme, literal, self.line)
         self.tokens.append(token)
 
@@ -136,40 +198,26 @@ class Scanner:
         return self.source[self.current]
 
     def string(self):
-        while (self.peek() != '"') and (not self.is_at_end()):
-            if self.peek() == "\n":
-                self.line += 1
-            self.advance()
-
-        if self.is_at_end():
+        # Strings may span lines, so count the newlines skipped over.
+        end: int = self.source.find('"', self.current)
+        if end == -1:
+            self.line += self.source.count("\n", self.current)
+            self.current = len(self.source)
             raise ScannerError(self.line, "unterminated string")
             # self.lox.error(self.line, "unterminated string")
-
+        self.line += self.source.count("\n", self.current, end)
         # advance beyond closing "
-        self.advance()
+        self.current = end + 1
         # Trim the quotation marks
         value = self.source[self.start + 1 : self.current - 1]
         self.add_token(TokenType.STRING, value)
 
     def number(self):
-        while self.peek().isdigit():
-            self.advance()
-        if (self.peek() == ".") and (self.peak_next()):
-            self.advance()
-            while self.peek().isdigit():
-                self.advance()
+        self.current = NUMBER_REST.match(self.source, self.current).end()
         self.add_token(TokenType.NUMBER, float(self.source[self.start : self.current]))
 
-    def peak_next(self) -> str:
-        if self.current + 1 >= len(self.source):
-            return "\0"
-        return self.source[self.current + 1]
-
     def identifier(self):
-        is_identifier = self.peek().isidentifier() or self.peek().isalnum()
-        while is_identifier:
-            self.advance()
-            is_identifier = self.peek().isidentifier() or self.peek().isalnum()
+        self.current = IDENTIFIER_REST.match(self.source, self.current).end()
         text: str = self.source[self.start : self.current]
         token_type: TokenType | None = KEYWORDS.get(text)
         if token_type is None:
@@ -5,11 +5,12 @@ from typing import Any
 from pylox.expr import Expr
 from pylox.tokens import Token
 
-class Stmt(ABC):
+class Stmt:
+
+	__slots__ = ()
 
-	@abstractmethod
 	def accept(self, visitor: StmtVisitor) -> Any:
-		pass
+		raise NotImplementedError
 
 
 class StmtVisitor(ABC):
@@ -45,14 +46,20 @@ class StmtVisitor(ABC):
 
 class BlockStmt(Stmt):
 
+	__slots__ = ("statements", "slot_count", "captured")
+
 	def __init__(self, statements: list[Stmt]):
 		self.statements = statements
+		self.slot_count: int = 0
+		self.captured: bool = False
 
 	def accept(self, visitor: StmtVisitor)-> Any:
 		return visitor.visit_block_stmt(self)
 
 class ExpressionStmt(Stmt):
 
+	__slots__ = ("expression",)
+
 	def __init__(self, expression: Expr):
 		self.expression = expression
 
@@ -61,16 +68,22 @@ class ExpressionStmt(Stmt):
 
 class FunctionStmt(Stmt):
 
+	__slots__ = ("name", "params", "body", "slot", "slot_count")
+
 	def __init__(self, name: Token, params: list[Token], body: list[Stmt]):
 		self.name = name
 		self.params = params
 		self.body = body
+		self.slot: int | None = None
+		self.slot_count: int = 0
 
 	def accept(self, visitor: StmtVisitor)-> Any:
 		return visitor.visit_function_stmt(self)
 
 class IfStmt(Stmt):
 
+	__slots__ = ("condition", "then_branch", "else_branch")
+
 	def __init__(self, condition: Expr, then_branch: Stmt, else_branch: Stmt | None):
 		self.condition = condition
 		self.then_branch = then_branch
@@ -81,6 +94,8 @@ class IfStmt(Stmt):
 
 class PrintStmt(Stmt):
 
+	__slots__ = ("expression",)
+
 	def __init__(self, expression: Expr):
 		self.expression = expression
 
@@ -89,15 +104,20 @@ class PrintStmt(Stmt):
 
 class VarStmt(Stmt):
 
+	__slots__ = ("name", "initialiser", "slot")
+
 	def __init__(self, name: Token, initialiser: Expr | None):
 		self.name = name
 		self.initialiser = initialiser
+		self.slot: int | None = None
 
 	def accept(self, visitor: StmtVisitor)-> Any:
 		return visitor.visit_var_stmt(self)
 
 class WhileStmt(Stmt):
 
+	__slots__ = ("condition", "body")
+
 	def __init__(self, condition: Expr, body: Stmt):
 		self.condition = condition
 		self.body = body
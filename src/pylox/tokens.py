@@ -3,6 +3,8 @@ import enum
 
 
 class Token:
+    __slots__ = ("token_type", "lexeme", "literal", "line")
+
     def __init__(self, token_type: TokenType, lexeme: str, literal, line: int):
         self.token_type = token_type
         self.lexeme = lexeme
@@ -10,10 +12,16 @@ class Token:
         self.line = line
 
     def __repr__(self) -> str:
-        return f"{self.token_type} {self.lexeme} {self.literal}"
+        return f"TokenType.{self.token_type.name} {self.lexeme} {self.literal}"
+
+
+class TokenType(enum.IntEnum):
+    """The kinds of token.
 
+    An IntEnum, so members hash and compare as ints, in C. (A plain Enum
+    hashes its members by name through a Python-level __hash__.)
+    """
 
-class TokenType(enum.Enum):
     # Single-character tokens
     LEFT_PAREN = enum.auto()
     RIGHT_PAREN = enum.auto()
@@ -0,0 +1,77 @@
+import contextlib
+import io
+import pathlib
+import unittest
+
+from pylox.interpreter import Interpreter
+from pylox.lox import Lox
+
+EXAMPLES = pathlib.Path(__file__).parent.parent / "examples"
+
+FIBONACCI = ["1.0", "1.0", "2.0", "3.0", "5.0", "8.0", "13.0", "21.0", "34.0"]
+
+# What each example prints, a line at a time.
+EXPECTED: dict[str, list[str]] = {
+    "control/for.lox": ["0.0", *FIBONACCI]
+    + ["55.0", "89.0", "144.0", "233.0", "377.0", "610.0", "987.0"]
+    + ["1597.0", "2584.0", "4181.0", "6765.0"],
+    "functions/add3.lox": ["6.0"],
+    "functions/hello.lox": ["Hi, Dear Reader!"],
+    "functions/print_fn.lox": ["<fn add >"],
+    "hello_world.lox": ["Hello world!"],
+    "variables/block_scope.lox": [
+        "inner a",
+        "outer b",
+        "global c",
+        "outer a",
+        "outer b",
+        "global c",
+        "global a",
+        "global b",
+        "global c",
+    ],
+    "variables/block_scope2.lox": ["3.0", "1.0"],
+    "variables/define_vs_assign.lox": [
+        "5.0",
+        "3.0",
+        "Undefined variable `y`.",
+        "[line 12]",
+    ],
+    "variables/fibonnacci.lox": [*FIBONACCI, "55.0", "89.0"],
+    "variables/uninitialised_variables.lox": ["None"],
+    "variables/variable_order.lox": ["Undefined variable `a`.", "[line 5]"],
+    "variables/variables.lox": ["before", "after"],
+    "variables/variables2.lox": ["3.0"],
+    "variables/while.lox": [f"{i}.0" for i in range(10)],
+}
+
+
+def run_file(path: pathlib.Path) -> list[str]:
+    """Run a script the way `pylox <file>` does, returning what it printed."""
+    # The globals are shared by every Interpreter, so start each run afresh.
+    Interpreter.globals.values.clear()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        Lox().run_file(str(path))
+    return output.getvalue().splitlines()
+
+
+class TestExamples(unittest.TestCase):
+    def test_examples(self):
+        for name, expected in EXPECTED.items():
+            with self.subTest(example=name):
+                self.assertEqual(run_file(EXAMPLES / name), expected)
+
+    def test_clock(self):
+        (printed,) = run_file(EXAMPLES / "functions" / "clock.lox")
+        self.assertGreater(float(printed), 0)
+
+    def test_every_example_is_checked(self):
+        names = {
+            path.relative_to(EXAMPLES).as_posix() for path in EXAMPLES.rglob("*.lox")
+        }
+        self.assertEqual(names, set(EXPECTED) | {"functions/clock.lox"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import contextlib
+import io
+import unittest
+
+from pylox import expr
+from pylox import stmt
+from pylox.interpreter import _EXPR_DISPATCH, _STMT_DISPATCH, Interpreter
+from pylox.lox import Lox
+
+
+def run(source: str) -> list[str]:
+    """Run a script, returning what it printed."""
+    # The globals are shared by every Interpreter, so start each run afresh.
+    Interpreter.globals.values.clear()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        Lox().run(source)
+    return output.getvalue().splitlines()
+
+
+class TestHoistedBlocks(unittest.TestCase):
+    def test_hoisted_local_does_not_clobber_captured_one(self):
+        source = """
+        fun f() {
+            var x = "outer";
+            fun g() { print x; }
+            { var x = "inner"; g(); print x; }
+            g();
+        }
+        f();
+        """
+        self.assertEqual(run(source), ["outer", "inner", "outer"])
+
+    def test_closure_sees_writes_from_hoisted_block(self):
+        source = """
+        var saved;
+        fun make() {
+            var n = 0;
+            { var m = 1; n = n + m; }
+            fun show() { print n; }
+            saved = show;
+        }
+        make();
+        saved();
+        """
+        self.assertEqual(run(source), ["1.0"])
+
+    def test_closures_keep_their_own_scope(self):
+        source = """
+        var first;
+        var second;
+        fun make(value) {
+            fun show() { print value; }
+            if (first == nil) first = show; else second = show;
+        }
+        make("a");
+        make("b");
+        first();
+        second();
+        """
+        self.assertEqual(run(source), ["a", "b"])
+
+
+class TestPooledEnvironments(unittest.TestCase):
+    def test_reused_environment_starts_empty(self):
+        source = """
+        var i = 0;
+        while (i < 3) { var a; print a; a = i; i = i + 1; }
+        { var b = "first"; print b; }
+        { var c; print c; }
+        """
+        self.assertEqual(run(source), ["None", "None", "None", "first", "None"])
+
+    def test_reused_environment_fits_a_larger_block(self):
+        source = """
+        { var a = 1; }
+        { var b = 2; var c = 3; var d = 4; print b + c + d; }
+        """
+        self.assertEqual(run(source), ["9.0"])
+
+    def test_shadowing_in_reused_environment(self):
+        source = """
+        var a = "global";
+        var i = 0;
+        while (i < 2) { print a; var a = "local"; print a; i = i + 1; }
+        print a;
+        """
+        self.assertEqual(
+            run(source), ["global", "local", "global", "local", "global"]
+        )
+
+    def test_recursion_gets_separate_environments(self):
+        source = """
+        fun count(n) {
+            if (n > 0) { var m = n - 1; count(m); print n; }
+        }
+        count(3);
+        """
+        self.assertEqual(run(source), ["1.0", "2.0", "3.0"])
+
+
+class TestFoldingKeepsErrors(unittest.TestCase):
+    def test_division_by_zero_still_fails_at_runtime(self):
+        with self.assertRaises(ZeroDivisionError):
+            run("print 1 / 0;")
+
+    def test_mixed_type_addition_still_fails_at_runtime(self):
+        self.assertEqual(
+            run('print "before"; print 1 + "a";'),
+            ["before", "Operands must be two numbers or two strings", "[line 1]"],
+        )
+
+    def test_negating_a_string_still_fails_at_runtime(self):
+        self.assertEqual(run('print -"a";'), ["Operand must be a number.", "[line 1]"])
+
+    def test_folded_results_match_unfolded(self):
+        # Each literal is also read from a variable, which cannot be folded.
+        for expression in [
+            "1 + 2 * 3",
+            "(1 + 2) * 3",
+            '"a" + "b"',
+            "1 < 2",
+            "1 == 1",
+            "!nil",
+            "nil or 1",
+            "1 or nil",
+            "false and 1",
+            "1 and 2",
+            "nil and nil",
+            "1 or 2",
+        ]:
+            with self.subTest(expression=expression):
+                unfolded = (
+                    expression.replace("1", "one").replace("2", "two")
+                    .replace("nil", "none")
+                )
+                source = (
+                    "var one = 1; var two = 2; var none = nil;"
+                    f"print {expression}; print {unfolded};"
+                )
+                folded, expected = run(source)
+                self.assertEqual(folded, expected)
+
+
+class TestCalls(unittest.TestCase):
+    def test_arity_is_checked(self):
+        source = "fun f(a) { print a; } f(1, 2);"
+        self.assertEqual(run(source), ["Expected 1 arguments but got 2.", "[line 1]"])
+
+    def test_local_arity_is_checked(self):
+        source = "{ fun f(a) { print a; } f(); }"
+        self.assertEqual(run(source), ["Expected 1 arguments but got 0.", "[line 1]"])
+
+    def test_redeclared_local_is_called_as_rebound(self):
+        source = """
+        {
+            fun f() { print "first"; }
+            f();
+            var f = "not a function";
+            f();
+        }
+        """
+        self.assertEqual(
+            run(source),
+            ["first", "Can only call functions and classes.", "[line 6]"],
+        )
+
+
+class TestDispatch(unittest.TestCase):
+    # A node type added to generate_ast.py must be given a visit method too.
+    def test_every_expression_is_dispatched(self):
+        self.assertEqual(set(_EXPR_DISPATCH), set(expr.Expr.__subclasses__()))
+
+    def test_every_statement_is_dispatched(self):
+        self.assertEqual(set(_STMT_DISPATCH), set(stmt.Stmt.__subclasses__()))
+
+
+if __name__ == "__main__":
+    unittest.main()
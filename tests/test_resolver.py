@@ -0,0 +1,186 @@
+import unittest
+
+from pylox import expr
+from pylox import stmt
+from pylox.parser import Parser
+from pylox.resolver import Resolver
+from pylox.scanner import Scanner
+
+
+def resolve(source: str) -> list[stmt.Stmt]:
+    """Parse and resolve a script, returning its statements."""
+    scanner = Scanner(source)
+    scanner.scan_tokens()
+    parser = Parser(scanner.tokens)
+    statements = parser.parse()
+    assert not parser.errors, parser.errors
+    Resolver().resolve(statements)
+    return statements
+
+
+def printed(source: str) -> expr.Expr:
+    """The resolved expression of a script's only statement, a print."""
+    (statement,) = resolve(source)
+    assert isinstance(statement, stmt.PrintStmt)
+    return statement.expression
+
+
+class TestSlots(unittest.TestCase):
+    def test_globals_are_left_to_lookup_by_name(self):
+        (declaration, statement) = resolve("var a = 1; print a;")
+        self.assertIsInstance(declaration, stmt.VarStmt)
+        self.assertIsNone(declaration.slot)
+        self.assertIsNone(statement.expression.depth)
+
+    def test_locals_get_slots_in_order(self):
+        (block,) = resolve("{ var a = 1; var b = 2; print b; a = 3; }")
+        a, b, print_b, assign_a = block.statements
+        self.assertEqual((a.slot, b.slot), (0, 1))
+        self.assertEqual((print_b.expression.depth, print_b.expression.slot), (0, 1))
+        self.assertEqual((assign_a.expression.depth, assign_a.expression.slot), (0, 0))
+        self.assertEqual(block.slot_count, 2)
+
+    def test_depth_counts_frames_out(self):
+        (function,) = resolve("fun f(a) { fun g(b) { print a; print b; } }")
+        (inner,) = function.body
+        print_a, print_b = inner.body
+        self.assertEqual((print_a.expression.depth, print_a.expression.slot), (1, 0))
+        self.assertEqual((print_b.expression.depth, print_b.expression.slot), (0, 0))
+
+    def test_initialiser_sees_the_outer_name(self):
+        (block,) = resolve("{ var a = 1; { var a = a + 2; } }")
+        _, inner = block.statements
+        (declaration,) = inner.statements
+        self.assertEqual(declaration.slot, 1)
+        self.assertEqual(declaration.initialiser.left.slot, 0)
+
+
+class TestHoisting(unittest.TestCase):
+    def test_nested_block_takes_slots_in_enclosing_frame(self):
+        (block,) = resolve("{ var a = 1; { var b = a; print b; } }")
+        _, inner = block.statements
+        declaration, statement = inner.statements
+        variable = statement.expression
+        self.assertEqual(declaration.slot, 1)
+        self.assertEqual((variable.depth, variable.slot), (0, 1))
+        self.assertEqual(inner.slot_count, 0)
+        self.assertEqual(block.slot_count, 2)
+
+    def test_nested_block_in_function_is_hoisted(self):
+        (function,) = resolve("fun f(a) { { var b = a; } }")
+        (inner,) = function.body
+        (declaration,) = inner.statements
+        self.assertEqual(declaration.slot, 1)
+        self.assertEqual(inner.slot_count, 0)
+        self.assertEqual(function.slot_count, 2)
+
+    def test_block_declaring_a_function_is_not_hoisted(self):
+        (block,) = resolve("{ var a = 1; { var b = a; fun g() { print b; } } }")
+        _, inner = block.statements
+        self.assertEqual(inner.slot_count, 2)
+        self.assertEqual(block.slot_count, 1)
+        declaration, function = inner.statements
+        self.assertEqual(declaration.initialiser.depth, 1)
+
+    def test_top_level_block_is_not_hoisted(self):
+        (block,) = resolve("{ var a = 1; }")
+        self.assertEqual(block.slot_count, 1)
+
+
+class TestCaptured(unittest.TestCase):
+    def test_block_with_function_is_captured(self):
+        (block,) = resolve("{ var a = 1; fun f() { print a; } }")
+        self.assertTrue(block.captured)
+
+    def test_block_without_function_is_not_captured(self):
+        (block,) = resolve("{ var a = 1; print a; }")
+        self.assertFalse(block.captured)
+
+    def test_every_enclosing_block_is_captured(self):
+        (block,) = resolve("{ var a = 1; { var b = 2; fun f() {} } }")
+        _, inner = block.statements
+        self.assertTrue(block.captured)
+        self.assertTrue(inner.captured)
+
+
+class TestFolding(unittest.TestCase):
+    def assertFolded(self, source: str, value):
+        expression = printed(source)
+        self.assertIsInstance(expression, expr.Literal)
+        self.assertEqual(expression.value, value)
+
+    def test_arithmetic_is_folded(self):
+        self.assertFolded("print 1 + 2 * 3;", 7.0)
+        self.assertFolded("print -(4 - 1);", -3.0)
+
+    def test_strings_are_folded(self):
+        self.assertFolded('print "a" + "b";', "ab")
+
+    def test_comparisons_are_folded(self):
+        self.assertFolded("print 1 < 2;", True)
+        self.assertFolded("print !nil;", True)
+
+    def test_logicals_with_known_result_are_folded(self):
+        self.assertFolded('print nil or "x";', "x")
+        self.assertFolded("print false and 1;", False)
+
+    def test_logical_with_unknown_result_is_kept(self):
+        (_, statement) = resolve("var a; print nil or a;")
+        self.assertIsInstance(statement.expression, expr.Logical)
+
+    def test_division_by_zero_is_not_folded(self):
+        self.assertIsInstance(printed("print 1 / 0;"), expr.Binary)
+
+    def test_mixed_type_addition_is_not_folded(self):
+        self.assertIsInstance(printed('print 1 + "a";'), expr.Binary)
+
+    def test_negated_string_is_not_folded(self):
+        self.assertIsInstance(printed('print -"a";'), expr.Unary)
+
+    def test_variables_are_not_folded(self):
+        (_, statement) = resolve("var a = 1; print a + 2;")
+        self.assertIsInstance(statement.expression, expr.Binary)
+
+
+class TestGrouping(unittest.TestCase):
+    def test_grouping_is_stripped(self):
+        (_, statement) = resolve("var a = 1; print (a);")
+        self.assertIsInstance(statement.expression, expr.Variable)
+
+    def test_nested_grouping_is_stripped(self):
+        (_, statement) = resolve("var a = 1; print ((a) + (2));")
+        expression = statement.expression
+        self.assertIsInstance(expression, expr.Binary)
+        self.assertIsInstance(expression.left, expr.Variable)
+        self.assertIsInstance(expression.right, expr.Literal)
+
+
+class TestVerifiedCalls(unittest.TestCase):
+    def call(self, statement: stmt.Stmt) -> expr.Call:
+        assert isinstance(statement, stmt.ExpressionStmt)
+        assert isinstance(statement.expression, expr.Call)
+        return statement.expression
+
+    def test_local_function_call_is_verified(self):
+        (block,) = resolve("{ fun f(a) {} f(1); }")
+        self.assertTrue(self.call(block.statements[1]).verified)
+
+    def test_wrong_arity_is_not_verified(self):
+        (block,) = resolve("{ fun f(a) {} f(); }")
+        self.assertFalse(self.call(block.statements[1]).verified)
+
+    def test_reassigned_function_is_not_verified(self):
+        (block,) = resolve("{ fun f() {} f(); f = nil; }")
+        self.assertFalse(self.call(block.statements[1]).verified)
+
+    def test_redeclared_function_is_not_verified(self):
+        (block,) = resolve("{ fun f() {} f(); var f; }")
+        self.assertFalse(self.call(block.statements[1]).verified)
+
+    def test_global_function_call_is_not_verified(self):
+        (_, statement) = resolve("fun f() {} f();")
+        self.assertFalse(self.call(statement).verified)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,14 +11,14 @@ def main():
         output_dir,
         "expr",
         [
-            "Assign = name: Token, value: Expr",
-            "Binary = left: Expr, operator: Token, right: Expr",
-            "Call = callee: Expr, paren: Token, arguments: list[Expr]",
+            "Assign = name: Token, value: Expr; depth: int | None = None, slot: int = 0",
+            "Binary = left: Expr, operator: Token, right: Expr; operation: Any = None",
+            "Call = callee: Expr, paren: Token, arguments: list[Expr]; verified: bool = False",
             "Grouping = expression: Expr",
             "Literal = value: Any",
-            "Logical = left: Expr, operator: Token, right: Expr",
-            "Unary = operator: Token, right: Expr",
-            "Variable = name: Token",
+            "Logical = left: Expr, operator: Token, right: Expr; is_or: bool = False",
+            "Unary = operator: Token, right: Expr; operation: Any = None",
+            "Variable = name: Token; depth: int | None = None, slot: int = 0",
         ],
         "from pylox.scanner import Token\n",
     )
@@ -26,12 +26,12 @@ def main():
         output_dir,
         "stmt",
         [
-            "BlockStmt = statements: list[Stmt]",
+            "BlockStmt = statements: list[Stmt]; slot_count: int = 0, captured: bool = False",
             "ExpressionStmt = expression: Expr",
-            "FunctionStmt = name: Token, params: list[Token], body: list[Stmt]",
+            "FunctionStmt = name: Token, params: list[Token], body: list[Stmt]; slot: int | None = None, slot_count: int = 0",
             "IfStmt = condition: Expr, then_branch: Stmt, else_branch: Stmt | None",
             "PrintStmt = expression: Expr",
-            "VarStmt = name: Token, initialiser: Expr | None",
+            "VarStmt = name: Token, initialiser: Expr | None; slot: int | None = None",
             "WhileStmt = condition: Expr, body: Stmt",
         ],
         "from pylox.expr import Expr\nfrom pylox.tokens import Token",
@@ -54,11 +54,14 @@ def define_ast(
         extra_imports,
         "\n",
         "\n",
-        f"class {abc_name}(ABC):\n",
+        # A plain base class: ABCMeta would route every isinstance check on
+        # a node through ABCMeta.__instancecheck__.
+        f"class {abc_name}:\n",
+        "\n",
+        "\t__slots__ = ()\n",
         "\n",
-        "\t@abstractmethod\n",
         f"\tdef accept(self, visitor: {abc_name}Visitor) -> Any:\n",
-        "\t\tpass\n",
+        "\t\traise NotImplementedError\n",
     ]
 
     visitor_lines = define_visitor(abc_name, types)
@@ -73,23 +76,48 @@ def define_ast(
 def define_subclasses(abc_name: str, token_types: list[str]) -> list[str]:
     output_text = []
     for token in token_types:
-        class_name = token.split("=")[0].strip()
-        fields = token.split("=")[1].strip()
-        class_text = define_subclass(abc_name, class_name, fields)
+        class_name, _, all_fields = token.partition("=")
+        # Fields after `;` are filled in by the resolver, not the parser.
+        fields, _, resolved_fields = all_fields.partition(";")
+        class_text = define_subclass(
+            abc_name,
+            class_name.strip(),
+            fields.strip(),
+            resolved_fields.strip(),
+        )
         output_text.extend(class_text)
     return output_text
 
 
-def define_subclass(abc_name: str, class_name: str, fields: str) -> list[str]:
+def define_subclass(
+    abc_name: str,
+    class_name: str,
+    fields: str,
+    resolved_fields: str,
+) -> list[str]:
+    field_names = [field.split(": ")[0] for field in fields.split(", ")]
+    defaults = dict()
+    if resolved_fields:
+        for field in resolved_fields.split(", "):
+            field_name, _, default = field.partition(" = ")
+            defaults[field_name] = default
+    # Slots drop the per-node __dict__, AST nodes are allocated in bulk.
+    slot_names = field_names + [name.split(": ")[0] for name in defaults]
+    slots = ", ".join(f'"{name}"' for name in slot_names)
+    if len(slot_names) == 1:
+        slots += ","
     output_text = [
         "\n\n",
         f"class {class_name}({abc_name}):\n",
         "\n",
+        f"\t__slots__ = ({slots})\n",
+        "\n",
         f"\tdef __init__(self, {fields}):\n",
     ]
-    for field in fields.split(", "):
-        field_name = field.split(": ")[0]
+    for field_name in field_names:
         output_text.extend([f"\t\tself.{field_name} = {field_name}\n"])
+    for field_name, default in defaults.items():
+        output_text.extend([f"\t\tself.{field_name} = {default}\n"])
 
     snake_name = pascal_to_snake(class_name)
     accept_lines = [